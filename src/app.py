@@ -1,17 +1,54 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
 import plotly.graph_objects as go
+import copy
+import functools
 import json
 import os
+from collections import deque
 import time
 from datetime import datetime, timedelta
 import sys
 import threading
 
-# Добавляем директорию src в путь для импорта
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# orjson разбирает JSON в разы быстрее стандартного модуля;
+# при его отсутствии используется стандартный json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# st_autorefresh планирует перезапуск скрипта с заданным интервалом
+# вместо постоянного цикла time.sleep + st.rerun
+try:
+    from streamlit_autorefresh import st_autorefresh
+except ImportError:
+    st_autorefresh = None
+
+# pyarrow нужен для колоночных Feather-сайдкаров истории за прошлые дни;
+# без него история читается напрямую из JSON
+try:
+    import pyarrow
+    FEATHER_AVAILABLE = True
+except ImportError:
+    FEATHER_AVAILABLE = False
+
+# ijson позволяет разбирать большие JSON-массивы потоково, не держа в
+# памяти одновременно и сырые байты файла, и все разобранные записи
+try:
+    import ijson
+    _HISTORY_PARSE_ERRORS = (ValueError, OSError, ijson.JSONError)
+except ImportError:
+    ijson = None
+    _HISTORY_PARSE_ERRORS = (ValueError, OSError)
+
+# Корень проекта вычисляется один раз при импорте модуля; добавляем его
+# в sys.path только если его там еще нет, чтобы записи не накапливались
+# при горячей перезагрузке
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
 from src.data_generator import SensorDataGenerator
 
 # Настройка страницы
@@ -23,8 +60,12 @@ st.set_page_config(
 )
 
 # Глобальные переменные
-DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data")
+DATA_PATH = os.path.normpath(os.path.join(_PROJECT_ROOT, "data"))
 REFRESH_INTERVAL = 5  # секунды
+SHOWN_ALERTS_LIMIT = 100  # сколько показанных оповещений помнить
+DOWNSAMPLE_THRESHOLD = 2000  # с какого размера ряда прореживать график
+DOWNSAMPLE_TARGET = 1500  # примерное число точек после прореживания
+LARGE_HISTORY_SIZE = 50 * 1024 * 1024  # с какого размера читать историю потоково
 
 # Словарь цветов для статусов
 STATUS_COLORS = {
@@ -33,6 +74,12 @@ STATUS_COLORS = {
     "critical": "#e74c3c"
 }
 
+# CSS-стили для статусов в таблице оповещений (вычислены один раз)
+STATUS_CSS = {
+    "Предупреждение": f"background-color: {STATUS_COLORS['warning']}; color: white",
+    "Критическое": f"background-color: {STATUS_COLORS['critical']}; color: white"
+}
+
 # Словарь русских названий и более дружественных названий для типов датчиков
 SENSOR_TYPE_NAMES = {
     "temperature": "Температура",
@@ -44,55 +91,277 @@ SENSOR_TYPE_NAMES = {
 }
 
 # Функции для работы с данными
+def _read_json_file(path):
+    """
+    Чтение и разбор JSON-файла.
+
+    Файл читается в бинарном режиме: orjson принимает bytes и
+    пропускает лишнее декодирование текста.
+    """
+    with open(path, 'rb') as file:
+        raw = file.read()
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+# Колонки записей истории (и их порядок) в DataFrame
+HISTORY_COLUMNS = ["device_id", "type", "value", "unit", "timestamp", "status"]
+
+
+def _empty_history_frame():
+    """Пустой DataFrame с колонками записей истории"""
+    return pd.DataFrame(columns=HISTORY_COLUMNS + ["datetime"])
+
+
+def _records_to_frame(records):
+    """Преобразование списка записей истории в типизированный DataFrame"""
+    if not records:
+        return _empty_history_frame()
+
+    df = pd.DataFrame(records, columns=HISTORY_COLUMNS)
+    df["timestamp"] = df["timestamp"].astype(np.float64)
+    for column in ("device_id", "type", "unit", "status"):
+        df[column] = df[column].astype("category")
+    # Дату-время считаем один раз при загрузке, а не при каждой отрисовке
+    df["datetime"] = pd.to_datetime(df["timestamp"], unit='s')
+    return df
+
+
+@functools.lru_cache(maxsize=8)
+def _load_history(path, mtime_ns, size):
+    """
+    Загрузка и разбор файла истории с кэшированием.
+
+    Ключ кэша включает mtime_ns и размер файла, поэтому при изменении
+    файла кэш инвалидируется автоматически, а при повторных перезапусках
+    скрипта Streamlit разбор JSON не выполняется заново.
+
+    Args:
+        path (str): Путь к файлу истории
+        mtime_ns (int): Время изменения файла в наносекундах (часть ключа кэша)
+        size (int): Размер файла в байтах (часть ключа кэша)
+
+    Returns:
+        pd.DataFrame: Записи истории в колоночном виде; кэшированный
+                      объект нельзя изменять на месте
+    """
+    try:
+        if ijson is not None and size > LARGE_HISTORY_SIZE:
+            # Большие файлы разбираем потоково, чтобы не держать в памяти
+            # и сырые байты, и разобранные записи одновременно
+            with open(path, 'rb') as file:
+                records = list(ijson.items(file, 'item', use_float=True))
+        else:
+            records = _read_json_file(path)
+    except _HISTORY_PARSE_ERRORS:
+        # ValueError покрывает и json.JSONDecodeError, и orjson.JSONDecodeError
+        records = []
+
+    return _records_to_frame(records)
+
+
+def load_history_file(path):
+    """
+    Получение разобранного содержимого файла истории через кэш.
+
+    Returns:
+        pd.DataFrame: Записи истории; пустой DataFrame, если файла нет
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return _empty_history_frame()
+    return _load_history(path, stat.st_mtime_ns, stat.st_size)
+
+
+def _parse_history_lines(raw):
+    """Разбор порции JSON-Lines (одна запись на строку) в список записей"""
+    loads = orjson.loads if orjson is not None else json.loads
+    records = []
+    for line in raw.splitlines():
+        if not line:
+            continue
+        try:
+            records.append(loads(line))
+        except ValueError:
+            continue
+    return records
+
+
+def _load_history_incremental(path):
+    """
+    Инкрементальное чтение JSON-Lines файла истории.
+
+    Для каждого файла в st.session_state хранится уже разобранный
+    DataFrame и байтовое смещение последней обработанной строки. При
+    очередном обновлении разбирается только дописанный «хвост» файла,
+    поэтому объем работы пропорционален числу новых записей, а не
+    размеру всего файла.
+    """
+    cache = st.session_state.setdefault('history_cache', {})
+
+    try:
+        stat = os.stat(path)
+    except OSError:
+        cache.pop(path, None)
+        return _empty_history_frame()
+
+    entry = cache.get(path)
+    if entry is not None and entry['mtime_ns'] == stat.st_mtime_ns:
+        return entry['df']
+
+    # Если файл стал короче (ротация/очистка), начинаем чтение заново
+    if entry is None or stat.st_size < entry['offset']:
+        entry = {'df': _empty_history_frame(), 'offset': 0, 'mtime_ns': 0}
+
+    with open(path, 'rb') as file:
+        file.seek(entry['offset'])
+        tail = file.read()
+
+    # Незавершенную последнюю строку не учитываем — она будет дочитана
+    # при следующем обновлении
+    complete_len = tail.rfind(b'\n') + 1
+    records = _parse_history_lines(tail[:complete_len])
+
+    df = entry['df']
+    if records:
+        new_df = _records_to_frame(records)
+        df = new_df if df.empty else pd.concat([df, new_df], ignore_index=True)
+
+    cache[path] = {
+        'df': df,
+        'offset': entry['offset'] + complete_len,
+        'mtime_ns': stat.st_mtime_ns,
+    }
+    return df
+
+
+@functools.lru_cache(maxsize=8)
+def _read_feather(path, mtime_ns, size):
+    """Чтение Feather-файла с кэшированием по (путь, mtime, размер)"""
+    return pd.read_feather(path)
+
+
+def _load_closed_day_columnar(date_str, source_path):
+    """
+    Загрузка истории завершенного дня через колоночный Feather-сайдкар.
+
+    JSON-источник разбирается один раз и сохраняется рядом в виде
+    history_YYYYMMDD.feather; последующие чтения идут из колоночного
+    файла, который pyarrow загружает на порядок быстрее разбора JSON.
+
+    Returns:
+        pd.DataFrame или None, если сайдкар создать/прочитать не удалось
+    """
+    feather_path = os.path.join(DATA_PATH, f"history_{date_str}.feather")
+    try:
+        source_stat = os.stat(source_path)
+        if os.path.exists(feather_path):
+            feather_stat = os.stat(feather_path)
+            if feather_stat.st_mtime_ns >= source_stat.st_mtime_ns:
+                return _read_feather(feather_path, feather_stat.st_mtime_ns, feather_stat.st_size)
+
+        # Сайдкара еще нет (или источник новее) — разбираем JSON и сохраняем
+        if source_path.endswith('.jsonl'):
+            with open(source_path, 'rb') as file:
+                df = _records_to_frame(_parse_history_lines(file.read()))
+        else:
+            df = load_history_file(source_path)
+        df.to_feather(feather_path)
+        return df
+    except Exception:
+        # Проблемы с сайдкаром не должны ломать чтение истории
+        return None
+
+
+def load_history_day(date_str):
+    """
+    Загрузка истории за указанный день.
+
+    Для завершенных дней (файл больше не дописывается) используется
+    колоночный Feather-сайдкар, если установлен pyarrow. Для текущего
+    дня предпочитается append-only формат JSON-Lines
+    (history_YYYYMMDD.jsonl) с инкрементальным чтением; старый формат
+    единого JSON-массива поддерживается через кэшированную полную
+    загрузку.
+    """
+    jsonl_path = os.path.join(DATA_PATH, f"history_{date_str}.jsonl")
+    json_path = os.path.join(DATA_PATH, f"history_{date_str}.json")
+
+    if FEATHER_AVAILABLE and date_str != datetime.now().strftime('%Y%m%d'):
+        source_path = jsonl_path if os.path.exists(jsonl_path) else json_path
+        if os.path.exists(source_path):
+            df = _load_closed_day_columnar(date_str, source_path)
+            if df is not None:
+                return df
+
+    if os.path.exists(jsonl_path):
+        return _load_history_incremental(jsonl_path)
+    return load_history_file(json_path)
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def _get_current_data_cached(mtime_ns):
+    """
+    Разбор current_data.json, кэшированный по mtime файла.
+
+    Пока файл не изменился, повторные вызовы в рамках одного и разных
+    перезапусков скрипта обходятся без чтения и разбора JSON.
+    """
+    current_data_path = os.path.join(DATA_PATH, "current_data.json")
+    try:
+        return _read_json_file(current_data_path)
+    except (ValueError, OSError):
+        return []
+
+
 def get_current_data():
     """Получение текущих данных всех датчиков"""
     current_data_path = os.path.join(DATA_PATH, "current_data.json")
-    if not os.path.exists(current_data_path):
-        return []
-    
     try:
-        with open(current_data_path, 'r') as file:
-            return json.load(file)
-    except (json.JSONDecodeError, FileNotFoundError):
+        mtime_ns = os.stat(current_data_path).st_mtime_ns
+    except OSError:
         return []
+    return _get_current_data_cached(mtime_ns)
 
 def get_device_history(device_id, hours=1):
     """Получение исторических данных для устройства за указанное количество часов"""
     now = datetime.now()
-    history_data = []
-    
+    frames = []
+
     # Проверяем файлы истории за текущий и предыдущий день (если запрашиваем данные, захватывающие предыдущий день)
     date_list = [now.strftime('%Y%m%d')]
     if hours > 24 or now.hour < hours:
         yesterday = now - timedelta(days=1)
         date_list.append(yesterday.strftime('%Y%m%d'))
-    
+
+    earliest_timestamp = (now - timedelta(hours=hours)).timestamp()
     for date_str in date_list:
-        history_path = os.path.join(DATA_PATH, f"history_{date_str}.json")
-        if os.path.exists(history_path):
-            try:
-                with open(history_path, 'r') as file:
-                    all_history = json.load(file)
-                    
-                    # Фильтрация по устройству и времени
-                    earliest_timestamp = (now - timedelta(hours=hours)).timestamp()
-                    device_history = [
-                        record for record in all_history 
-                        if record["device_id"] == device_id and record["timestamp"] >= earliest_timestamp
-                    ]
-                    history_data.extend(device_history)
-            except (json.JSONDecodeError, FileNotFoundError):
-                pass
-    
+        all_history = load_history_day(date_str)
+        if all_history.empty:
+            continue
+
+        # Генератор пишет историю хронологически, поэтому границу окна
+        # находим бинарным поиском и фильтруем только «хвост»
+        start = np.searchsorted(all_history["timestamp"].values, earliest_timestamp)
+        if start >= len(all_history):
+            continue
+        recent = all_history.iloc[start:]
+        frames.append(recent[recent["device_id"] == device_id])
+
+    if not frames:
+        return _empty_history_frame()
+
     # Сортировка по времени
-    history_data.sort(key=lambda x: x["timestamp"])
-    return history_data
+    history_data = pd.concat(frames, ignore_index=True)
+    return history_data.sort_values("timestamp", ignore_index=True)
 
 def get_all_alerts(hours=24):
     """Получение всех оповещений за указанное количество часов"""
     now = datetime.now()
-    alerts = []
-    
+    frames = []
+
     # Проверяем файлы истории за нужные дни
     date_list = [now.strftime('%Y%m%d')]
     if hours > 24:
@@ -100,86 +369,155 @@ def get_all_alerts(hours=24):
         for i in range(1, days_needed):
             prev_day = now - timedelta(days=i)
             date_list.append(prev_day.strftime('%Y%m%d'))
-    
+
+    earliest_timestamp = (now - timedelta(hours=hours)).timestamp()
     for date_str in date_list:
-        history_path = os.path.join(DATA_PATH, f"history_{date_str}.json")
-        if os.path.exists(history_path):
-            try:
-                with open(history_path, 'r') as file:
-                    all_history = json.load(file)
-                    
-                    # Фильтрация по статусу и времени
-                    earliest_timestamp = (now - timedelta(hours=hours)).timestamp()
-                    alerts_list = [
-                        record for record in all_history 
-                        if record["status"] != "normal" and record["timestamp"] >= earliest_timestamp
-                    ]
-                    alerts.extend(alerts_list)
-            except (json.JSONDecodeError, FileNotFoundError):
-                pass
-    
+        all_history = load_history_day(date_str)
+        if all_history.empty:
+            continue
+
+        # Граница окна — бинарным поиском по отсортированным меткам,
+        # статус фильтруем только на попавшем в окно «хвосте»
+        start = np.searchsorted(all_history["timestamp"].values, earliest_timestamp)
+        if start >= len(all_history):
+            continue
+        recent = all_history.iloc[start:]
+        frames.append(recent[recent["status"] != "normal"])
+
+    if not frames:
+        return _empty_history_frame()
+
     # Сортировка по времени (от новых к старым)
-    alerts.sort(key=lambda x: x["timestamp"], reverse=True)
-    return alerts
+    alerts = pd.concat(frames, ignore_index=True)
+    return alerts.sort_values("timestamp", ascending=False, ignore_index=True)
 
 def format_timestamp(timestamp):
     """Преобразование UNIX-времени в человекочитаемый формат"""
     return datetime.fromtimestamp(timestamp).strftime('%d.%m.%Y %H:%M:%S')
 
+
+def classify_values(values, normal_range, warning_range):
+    """
+    Векторная классификация значений по пороговым диапазонам.
+
+    Все сравнения выполняются масками NumPy над массивом значений, без
+    Python-ветвлений на каждое показание — так статусы можно пересчитать
+    по актуальным настройкам порогов при каждой отрисовке.
+
+    Args:
+        values: Значения датчиков (любая последовательность чисел)
+        normal_range (tuple): Нормальный диапазон (мин, макс)
+        warning_range (tuple): Диапазон предупреждений (мин, макс)
+
+    Returns:
+        np.ndarray: Статус 'normal'/'warning'/'critical' для каждого значения
+    """
+    values = np.asarray(values, dtype=np.float64)
+    warning_mask = (values < normal_range[0]) | (values > normal_range[1])
+    critical_mask = (values < warning_range[0]) | (values > warning_range[1])
+    return np.select([critical_mask, warning_mask], ["critical", "warning"], default="normal")
+
 # Функции для визуализации
-def create_gauge_chart(value, title, unit, min_val, max_val, threshold_warning, threshold_critical, status):
-    """Создание индикатора в виде спидометра"""
-    color = STATUS_COLORS[status]
-    
-    fig = go.Figure(go.Indicator(
-        mode="gauge+number",
-        value=value,
-        domain={'x': [0, 1], 'y': [0, 1]},
-        title={'text': title, 'font': {'size': 24}},
-        gauge={
-            'axis': {'range': [min_val, max_val], 'tickwidth': 1, 'tickcolor': "#FFFFFF"},
-            'bar': {'color': color},
+
+# Неизменные части фигуры-спидометра построены один раз; при отрисовке
+# шаблон клонируется и в нем заполняются только значение, цвета и
+# диапазоны — без повторного построения объектов plotly с валидацией
+# каждого атрибута
+_GAUGE_TEMPLATE = {
+    'data': [{
+        'type': 'indicator',
+        'mode': 'gauge+number',
+        'value': 0.0,
+        'domain': {'x': [0, 1], 'y': [0, 1]},
+        'title': {'text': '', 'font': {'size': 24}},
+        'gauge': {
+            'axis': {'range': [0.0, 1.0], 'tickwidth': 1, 'tickcolor': "#FFFFFF"},
+            'bar': {'color': ''},
             'bgcolor': "white",
             'borderwidth': 2,
             'bordercolor': "gray",
-            'steps': [
-                {'range': [min_val, threshold_warning[0]], 'color': 'rgba(255, 255, 0, 0.1)'},
-                {'range': [threshold_warning[0], threshold_warning[1]], 'color': 'rgba(0, 255, 0, 0.3)'},
-                {'range': [threshold_warning[1], max_val], 'color': 'rgba(255, 0, 0, 0.1)'}
-            ],
+            'steps': [],
             'threshold': {
                 'line': {'color': "red", 'width': 3},
                 'thickness': 0.75,
-                'value': threshold_critical[1] if value < threshold_critical[1] else threshold_critical[0]
+                'value': 0.0
             }
         },
-        number={'suffix': f" {unit}", 'font': {'size': 20, 'color': color}}
-    ))
-    
-    fig.update_layout(
-        height=250,
-        margin=dict(l=20, r=20, t=50, b=20),
-    )
-    
-    return fig
+        'number': {'suffix': '', 'font': {'size': 20, 'color': ''}}
+    }],
+    'layout': {
+        'height': 250,
+        'margin': {'l': 20, 'r': 20, 't': 50, 'b': 20}
+    }
+}
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def create_gauge_chart(value, title, unit, min_val, max_val, threshold_warning, threshold_critical, status):
+    """Создание индикатора в виде спидометра"""
+    color = STATUS_COLORS[status]
 
+    figure_dict = copy.deepcopy(_GAUGE_TEMPLATE)
+    indicator = figure_dict['data'][0]
+    indicator['value'] = value
+    indicator['title']['text'] = title
+    indicator['number']['suffix'] = f" {unit}"
+    indicator['number']['font']['color'] = color
+
+    gauge = indicator['gauge']
+    gauge['axis']['range'] = [min_val, max_val]
+    gauge['bar']['color'] = color
+    gauge['steps'] = [
+        {'range': [min_val, threshold_warning[0]], 'color': 'rgba(255, 255, 0, 0.1)'},
+        {'range': [threshold_warning[0], threshold_warning[1]], 'color': 'rgba(0, 255, 0, 0.3)'},
+        {'range': [threshold_warning[1], max_val], 'color': 'rgba(255, 0, 0, 0.1)'}
+    ]
+    gauge['threshold']['value'] = threshold_critical[1] if value < threshold_critical[1] else threshold_critical[0]
+
+    return go.Figure(figure_dict)
+
+# DataFrame истории хэшируется дешево: по длине и последней временной
+# метке (история append-only, поэтому этого достаточно для инвалидации)
+@st.cache_data(
+    max_entries=16,
+    show_spinner=False,
+    hash_funcs={pd.DataFrame: lambda d: (len(d), float(d['timestamp'].iat[-1]) if len(d) else 0.0)}
+)
 def create_time_series_chart(history_data, title, unit):
     """Создание графика изменения показаний во времени"""
-    if not history_data:
+    if history_data.empty:
         return go.Figure()
+
+    # Колонка datetime уже вычислена при загрузке истории
+    df = history_data
+
+    # Длинные ряды прореживаем до ~DOWNSAMPLE_TARGET точек: на экране
+    # все равно не различить больше, а браузеру уходит в разы меньше
+    # данных. Метки аномалий ниже рисуются по исходному ряду без
+    # прореживания
+    line_df = df
+    if len(df) > DOWNSAMPLE_THRESHOLD:
+        span_seconds = float(df['timestamp'].iat[-1] - df['timestamp'].iat[0])
+        bucket_seconds = max(int(span_seconds // DOWNSAMPLE_TARGET), 1)
+        line_df = (
+            df.set_index('datetime')[['value']]
+            .resample(f'{bucket_seconds}s')
+            .mean()
+            .dropna()
+            .reset_index()
+        )
     
-    # Преобразование данных в DataFrame
-    df = pd.DataFrame(history_data)
-    df['datetime'] = pd.to_datetime(df['timestamp'], unit='s')
-    
-    # Создание графика с Plotly
-    fig = px.line(
-        df, 
-        x='datetime', 
-        y='value',
-        title=title,
-        labels={'value': f'Значение ({unit})', 'datetime': 'Время'},
-        color_discrete_sequence=['#1f77b4']
+    # Создание графика через низкоуровневый API go: дешевле, чем px.line,
+    # а Scattergl отрисовывает длинные ряды на клиенте через WebGL
+    fig = go.Figure()
+    fig.add_trace(
+        go.Scattergl(
+            x=line_df['datetime'],
+            y=line_df['value'],
+            mode='lines',
+            line=dict(color='#1f77b4'),
+            name='Значение'
+        )
     )
     
     # Добавление меток для аномалий
@@ -188,7 +526,7 @@ def create_time_series_chart(history_data, title, unit):
     
     if not warning_points.empty:
         fig.add_trace(
-            go.Scatter(
+            go.Scattergl(
                 x=warning_points['datetime'],
                 y=warning_points['value'],
                 mode='markers',
@@ -199,7 +537,7 @@ def create_time_series_chart(history_data, title, unit):
     
     if not critical_points.empty:
         fig.add_trace(
-            go.Scatter(
+            go.Scattergl(
                 x=critical_points['datetime'],
                 y=critical_points['value'],
                 mode='markers',
@@ -209,6 +547,9 @@ def create_time_series_chart(history_data, title, unit):
         )
     
     fig.update_layout(
+        title=title,
+        xaxis_title='Время',
+        yaxis_title=f'Значение ({unit})',
         height=300,
         margin=dict(l=20, r=20, t=50, b=20),
         hovermode='x unified',
@@ -264,19 +605,28 @@ def render_dashboard(current_data):
     for i, (sensor_type, tab) in enumerate(zip(device_by_type.keys(), tabs)):
         with tab:
             devices = device_by_type[sensor_type]
+            threshold_settings = st.session_state.threshold_settings[sensor_type]
+            normal_range = threshold_settings["normal"]
+            warning_range = threshold_settings["warning"]
+
+            # Определение мин и макс значений для датчика
+            min_val = warning_range[0] - (warning_range[1] - warning_range[0]) * 0.2
+            max_val = warning_range[1] + (warning_range[1] - warning_range[0]) * 0.2
+
+            # Статусы пересчитываются одним векторным вызовом по актуальным
+            # настройкам порогов — изменение порогов видно сразу, без
+            # ожидания следующего тика генератора
+            statuses = classify_values(
+                [d["value"] for d in devices], normal_range, warning_range
+            )
+
             cols = st.columns(min(len(devices), 3))  # Максимум 3 колонки для лучшего отображения
-            
+
             for j, device in enumerate(devices):
                 col_idx = j % len(cols)  # Распределяем устройства по доступным колонкам
                 with cols[col_idx]:
-                    threshold_settings = st.session_state.threshold_settings[sensor_type]
-                    normal_range = threshold_settings["normal"]
-                    warning_range = threshold_settings["warning"]
-                    
-                    # Определение мин и макс значений для датчика
-                    min_val = warning_range[0] - (warning_range[1] - warning_range[0]) * 0.2
-                    max_val = warning_range[1] + (warning_range[1] - warning_range[0]) * 0.2
-                    
+                    status = str(statuses[j])
+
                     fig = create_gauge_chart(
                         value=device["value"],
                         title=f"{device['device_id']}",
@@ -285,31 +635,31 @@ def render_dashboard(current_data):
                         max_val=max_val,
                         threshold_warning=normal_range,
                         threshold_critical=warning_range,
-                        status=device["status"]
+                        status=status
                     )
                     st.plotly_chart(fig, use_container_width=True)
-                    
+
                     status_text = {
                         "normal": "Норма",
                         "warning": "Предупреждение",
                         "critical": "Критическое"
                     }
-                    
+
                     st.markdown(
                         f"""
                         <div style='text-align: center;'>
-                            <span style='color: {STATUS_COLORS[device["status"]]}; font-weight: bold;'>
-                                {status_text[device["status"]]}
+                            <span style='color: {STATUS_COLORS[status]}; font-weight: bold;'>
+                                {status_text[status]}
                             </span>
                         </div>
-                        """, 
+                        """,
                         unsafe_allow_html=True
                     )
 
-def render_device_details(time_window):
+def render_device_details(current_data, time_window):
     """Рендеринг детальной информации об устройствах"""
     st.header("Подробная информация об устройствах")
-    
+
     # Конвертация временного окна в часы
     hours_mapping = {
         "Последний час": 1,
@@ -319,9 +669,7 @@ def render_device_details(time_window):
         "Последние 7 дней": 24 * 7
     }
     hours = hours_mapping[time_window]
-    
-    # Получение текущих данных
-    current_data = get_current_data()
+
     if not current_data:
         st.warning("Нет данных с датчиков. Убедитесь, что генератор данных запущен.")
         return
@@ -370,9 +718,8 @@ def render_device_details(time_window):
     # Статистика по устройству
     st.subheader("Статистика")
     
-    if history_data:
-        df = pd.DataFrame(history_data)
-        values = df['value']
+    if not history_data.empty:
+        values = history_data['value']
         
         col1, col2, col3, col4 = st.columns(4)
         with col1:
@@ -385,8 +732,8 @@ def render_device_details(time_window):
             st.metric("Стандартное отклонение", f"{values.std():.2f} {device_unit}")
             
         # Количество аномалий
-        warnings_count = len(df[df['status'] == 'warning'])
-        critical_count = len(df[df['status'] == 'critical'])
+        warnings_count = int((history_data['status'] == 'warning').sum())
+        critical_count = int((history_data['status'] == 'critical').sum())
         
         col1, col2 = st.columns(2)
         with col1:
@@ -413,13 +760,14 @@ def render_alerts(time_window):
     # Получение оповещений
     alerts = get_all_alerts(hours)
     
-    if not alerts:
+    if alerts.empty:
         st.success("Нет оповещений за выбранный период.")
         return
-    
-    # Подсчет количества оповещений
-    warning_count = len([a for a in alerts if a['status'] == 'warning'])
-    critical_count = len([a for a in alerts if a['status'] == 'critical'])
+
+    # Подсчет количества оповещений за один проход
+    status_counts = alerts['status'].value_counts()
+    warning_count = int(status_counts.get('warning', 0))
+    critical_count = int(status_counts.get('critical', 0))
     
     # Отображение статистики
     col1, col2, col3 = st.columns(3)
@@ -441,7 +789,7 @@ def render_alerts(time_window):
         )
     
     with filter_col2:
-        device_types = list(set([a["type"] for a in alerts]))
+        device_types = alerts["type"].unique().tolist()
         filter_types = st.multiselect(
             "Фильтр по типу устройства",
             options=device_types,
@@ -449,39 +797,31 @@ def render_alerts(time_window):
             format_func=lambda x: SENSOR_TYPE_NAMES[x]
         )
     
-    # Применение фильтров
-    filtered_alerts = [
-        a for a in alerts 
-        if a["status"] in filter_status and a["type"] in filter_types
+    # Применение фильтров (векторизованные маски)
+    filtered_alerts = alerts[
+        alerts["status"].isin(filter_status) & alerts["type"].isin(filter_types)
     ]
-    
-    # Создание таблицы оповещений
-    if filtered_alerts:
-        alert_data = []
-        for alert in filtered_alerts:
-            alert_data.append({
-                "Время": format_timestamp(alert["timestamp"]),
-                "Устройство": alert["device_id"],
-                "Тип": SENSOR_TYPE_NAMES[alert["type"]],
-                "Значение": f"{alert['value']} {alert['unit']}",
-                "Статус": "Предупреждение" if alert["status"] == "warning" else "Критическое"
-            })
-        
-        df = pd.DataFrame(alert_data)
-        
-        # Применение стилей к таблице
-        def highlight_status(val):
-            if val == "Предупреждение":
-                return f'background-color: {STATUS_COLORS["warning"]}; color: white'
-            elif val == "Критическое":
-                return f'background-color: {STATUS_COLORS["critical"]}; color: white'
-            return ''
+
+    # Создание таблицы оповещений (поколоночно, без пересборки списка словарей)
+    if not filtered_alerts.empty:
+        df = pd.DataFrame({
+            # Форматирование времени одним векторным strftime по колонке
+            "Время": filtered_alerts["datetime"].dt.strftime('%d.%m.%Y %H:%M:%S'),
+            "Устройство": filtered_alerts["device_id"].astype(str),
+            "Тип": filtered_alerts["type"].map(SENSOR_TYPE_NAMES),
+            "Значение": filtered_alerts["value"].astype(str) + " " + filtered_alerts["unit"].astype(str),
+            "Статус": filtered_alerts["status"].map(
+                {"warning": "Предупреждение", "critical": "Критическое"}
+            )
+        })
         
-        styled_df = df.style.applymap(
-            highlight_status, 
+        # Применение стилей к таблице: CSS подбирается одним векторным
+        # map по колонке, без вызова Python-функции на каждую ячейку
+        styled_df = df.style.apply(
+            lambda col: col.map(STATUS_CSS).fillna(''),
             subset=['Статус']
         )
-        
+
         st.dataframe(styled_df, use_container_width=True)
     else:
         st.info("Нет оповещений, соответствующих выбранным фильтрам.")
@@ -537,22 +877,55 @@ def render_settings():
     
     # Очистка исторических данных
     if st.button("Очистить исторические данные"):
-        # Получаем список файлов в директории данных
-        for file in os.listdir(DATA_PATH):
-            if file.startswith("history_"):
-                file_path = os.path.join(DATA_PATH, file)
-                try:
-                    os.remove(file_path)
-                except Exception as e:
-                    st.error(f"Ошибка при удалении файла {file}: {e}")
-        
+        # os.scandir отдает записи каталога вместе с кэшированными
+        # метаданными — без отдельного stat на каждый файл; под шаблон
+        # попадают и JSON/JSON-Lines файлы, и Feather-сайдкары
+        with os.scandir(DATA_PATH) as entries:
+            for entry in entries:
+                if entry.name.startswith("history_") and entry.is_file():
+                    try:
+                        os.remove(entry.path)
+                    except OSError as e:
+                        st.error(f"Ошибка при удалении файла {entry.name}: {e}")
+
+        # Сбрасываем инкрементальный кэш, чтобы не осталось ссылок на
+        # удаленные файлы
+        st.session_state.pop('history_cache', None)
+
         st.success("Исторические данные очищены")
 
+def _mark_alert_shown(alert_id):
+    """
+    Пометить оповещение показанным.
+
+    Идентификаторы хранятся в множестве (быстрая проверка вхождения) и
+    параллельной очереди с ограниченной длиной: при переполнении самый
+    старый идентификатор вытесняется за O(1) без пересоздания множества.
+    """
+    queue = st.session_state.shown_alerts_queue
+    shown = st.session_state.shown_alerts
+    if len(queue) == queue.maxlen:
+        shown.discard(queue.popleft())
+    queue.append(alert_id)
+    shown.add(alert_id)
+
+
 # Функция для отображения всплывающих уведомлений об аномалиях
 def show_alert_notifications(current_data):
     if not current_data:
         return
-    
+
+    # Пока current_data.json не перезаписан генератором, набор оповещений
+    # не мог измениться — пропускаем повторную обработку целиком
+    current_data_path = os.path.join(DATA_PATH, "current_data.json")
+    try:
+        mtime_ns = os.stat(current_data_path).st_mtime_ns
+    except OSError:
+        mtime_ns = None
+    if mtime_ns is not None and mtime_ns == st.session_state.get('last_alert_mtime'):
+        return
+    st.session_state.last_alert_mtime = mtime_ns
+
     # Проверяем статусы датчиков
     warning_alerts = [d for d in current_data if d["status"] == "warning"]
     critical_alerts = [d for d in current_data if d["status"] == "critical"]
@@ -564,13 +937,16 @@ def show_alert_notifications(current_data):
         st.session_state.critical_count = 0
     if 'shown_alerts' not in st.session_state:
         st.session_state.shown_alerts = set()
-    
+        # Очередь задает порядок вытеснения: при переполнении самый
+        # старый идентификатор удаляется и из множества
+        st.session_state.shown_alerts_queue = deque(maxlen=SHOWN_ALERTS_LIMIT)
+
     # Показываем всплывающие уведомления для новых критических оповещений
     for alert in critical_alerts:
-        alert_id = f"{alert['device_id']}_{alert['timestamp']}"
+        alert_id = (alert['device_id'], alert['timestamp'])
         if alert_id not in st.session_state.shown_alerts:
-            st.session_state.shown_alerts.add(alert_id)
-            
+            _mark_alert_shown(alert_id)
+
             # Используем toast для всплывающих уведомлений
             st.toast(
                 f"⚠️ КРИТИЧЕСКОЕ: {SENSOR_TYPE_NAMES[alert['type']]} ({alert['device_id']}) - {alert['value']} {alert['unit']}",
@@ -582,10 +958,10 @@ def show_alert_notifications(current_data):
     
     # Показываем всплывающие уведомления для новых предупреждений
     for alert in warning_alerts:
-        alert_id = f"{alert['device_id']}_{alert['timestamp']}"
+        alert_id = (alert['device_id'], alert['timestamp'])
         if alert_id not in st.session_state.shown_alerts:
-            st.session_state.shown_alerts.add(alert_id)
-            
+            _mark_alert_shown(alert_id)
+
             # Только всплывающее уведомление для предупреждений
             st.toast(
                 f"⚠️ ПРЕДУПРЕЖДЕНИЕ: {SENSOR_TYPE_NAMES[alert['type']]} ({alert['device_id']}) - {alert['value']} {alert['unit']}",
@@ -598,10 +974,6 @@ def show_alert_notifications(current_data):
     
     if len(warning_alerts) > st.session_state.warning_count:
         st.session_state.warning_count = len(warning_alerts)
-    
-    # Очищаем старые оповещения (чтобы не хранить слишком много идентификаторов)
-    if len(st.session_state.shown_alerts) > 100:
-        st.session_state.shown_alerts = set(list(st.session_state.shown_alerts)[-50:])
 
 # Основная функция приложения
 def main():
@@ -694,25 +1066,34 @@ def main():
         # Показываем уведомления об аномалиях
         show_alert_notifications(current_data)
         
-        # Основные табы приложения
-        tab1, tab2, tab3, tab4 = st.tabs(["Панель мониторинга", "Подробная информация", "Оповещения", "Настройки"])
-        
-        with tab1:
+        # Основные разделы приложения. Переключатель вместо st.tabs:
+        # st.tabs выполняет все вкладки на каждом перезапуске, а так
+        # данные и графики строятся только для активного раздела
+        active_view = st.radio(
+            "Раздел",
+            options=["Панель мониторинга", "Подробная информация", "Оповещения", "Настройки"],
+            horizontal=True,
+            label_visibility="collapsed",
+            key="active_view"
+        )
+
+        if active_view == "Панель мониторинга":
             render_dashboard(current_data)
-        
-        with tab2:
-            render_device_details(time_window)
-        
-        with tab3:
+        elif active_view == "Подробная информация":
+            render_device_details(current_data, time_window)
+        elif active_view == "Оповещения":
             render_alerts(time_window)
-        
-        with tab4:
+        else:
             render_settings()
     
-    # Автоматическое обновление
+    # Автоматическое обновление с выбранной пользователем периодичностью
     if auto_refresh:
-        time.sleep(0.1)  # Небольшая задержка для корректного рендеринга
-        st.rerun()
+        if st_autorefresh is not None:
+            st_autorefresh(interval=refresh_interval * 1000, key="auto_refresh")
+        else:
+            # Резервный вариант без streamlit-autorefresh
+            time.sleep(refresh_interval)
+            st.rerun()
 
 if __name__ == "__main__":
     main()
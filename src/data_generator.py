@@ -1,24 +1,108 @@
+import heapq
 import json
-import random
+import queue
 import time
 import threading
 import os
+from collections import deque
 from datetime import datetime
 import math
 
+import numpy as np
+
+# orjson сериализует JSON примерно на порядок быстрее стандартного
+# модуля и сразу отдает bytes; без него используется стандартный json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _dumps(obj, pretty=False):
+    """
+    Сериализация объекта в JSON-байты.
+
+    Args:
+        obj: Сериализуемый объект
+        pretty (bool): Форматировать с отступами (для файлов, которые
+                       читает человек)
+
+    Returns:
+        bytes: JSON в кодировке UTF-8
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+    return json.dumps(obj, ensure_ascii=False, indent=2 if pretty else None).encode('utf-8')
+
+
+def _loads(raw):
+    """Разбор JSON из байтов"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+# Строковые метки статусов по числовому коду из _tick_kernel
+_STATUS_LABELS = ("normal", "warning", "critical")
+
+
+def _tick_kernel(base, variances, amplitudes, trend_sin,
+                 normal_lo, normal_hi, warning_lo, warning_hi,
+                 gauss, urand_anomaly, urand_dir, urand_mag,
+                 anomaly_probability, out_values, out_statuses):
+    """
+    Вычислительное ядро одного тика по SoA-массивам конфигурации.
+
+    Весь расчет тика — тренд, шум, аномалии, округление, классификация
+    статусов — собран в одной функции над типизированными массивами без
+    объектов Python: результат пишется в предвыделенные выходные
+    массивы, статусы кодируются числами (0 — normal, 1 — warning,
+    2 — critical) и преобразуются в строки только при сериализации.
+
+    Args:
+        base, variances, amplitudes, trend_sin: конфигурация и значение
+            тренда по индексу устройства
+        normal_lo, normal_hi, warning_lo, warning_hi: границы диапазонов
+        gauss, urand_anomaly, urand_dir, urand_mag: случайные выборки тика
+        anomaly_probability (float): вероятность случайной аномалии
+        out_values (ndarray): выходные значения (float64)
+        out_statuses (ndarray): выходные коды статусов (int8)
+    """
+    out_values[:] = base + amplitudes * trend_sin + gauss * variances
+
+    # Случайные аномалии: значительное отклонение от нормы
+    anomaly_mask = urand_anomaly < anomaly_probability
+    if anomaly_mask.any():
+        directions = np.where(urand_dir > 0.5, 1.0, -1.0)
+        magnitudes = (normal_hi - normal_lo) * (1.2 + 0.3 * urand_mag)
+        out_values[:] = np.where(
+            anomaly_mask, out_values + directions * magnitudes, out_values
+        )
+
+    np.round(out_values, 2, out=out_values)
+
+    # Классификация статусов масками по диапазонам
+    out_statuses[:] = 0
+    out_statuses[(out_values < normal_lo) | (out_values > normal_hi)] = 1
+    out_statuses[(out_values < warning_lo) | (out_values > warning_hi)] = 2
+
+
 class SensorDataGenerator:
     """
     Класс для эмуляции работы IoT-датчиков и генерации данных.
     """
     
-    def __init__(self, data_path="../data"):
+    def __init__(self, data_path="../data", pretty=False):
         """
         Инициализация генератора данных.
-        
+
         Args:
             data_path (str): Путь к директории для сохранения данных
+            pretty (bool): Писать current_data.json с отступами (для
+                           отладки глазами); история всегда компактная
         """
         self.data_path = data_path
+        self.pretty = pretty
         self.ensure_data_dir()
         
         # Настройки базовых значений для различных типов датчиков
@@ -86,13 +170,97 @@ class SensorDataGenerator:
                 device_id = f"{sensor_type}_{i:02d}"
                 self.devices.append({
                     "device_id": device_id,
-                    "type": sensor_type
+                    "type": sensor_type,
+                    # Ссылка на конфигурацию типа, чтобы не ходить по
+                    # цепочке sensor_configs[type] на каждое обращение
+                    "_config": self.sensor_configs[sensor_type]
                 })
         
+        # Неизменные поля записи каждого устройства (device_id, type,
+        # unit) сериализуются один раз; на тике к готовому префиксу
+        # дописываются только значение, метка времени и статус
+        for device in self.devices:
+            invariant = _dumps({
+                "device_id": device["device_id"],
+                "type": device["type"],
+                "unit": device["_config"]["unit"]
+            })
+            device["_json_prefix"] = invariant[:-1] + b',"value":'
+
+        # SoA-массивы конфигурации по индексу устройства: позволяют
+        # вычислять значения всех датчиков за один векторный проход
+        configs = [device["_config"] for device in self.devices]
+        self._base_values = np.array([c["base_value"] for c in configs])
+        self._variances = np.array([c["variance"] for c in configs])
+        self._trend_amplitudes = np.array([c["trend_amplitude"] for c in configs])
+        self._trend_periods = np.array([c["trend_period"] for c in configs])
+        self._normal_lo = np.array([c["normal_range"][0] for c in configs])
+        self._normal_hi = np.array([c["normal_range"][1] for c in configs])
+        self._warning_lo = np.array([c["warning_range"][0] for c in configs])
+        self._warning_hi = np.array([c["warning_range"][1] for c in configs])
+        self._rng = np.random.default_rng()
+
+        # Предвыделенные выходные массивы _tick_kernel
+        self._out_values = np.empty(len(self.devices))
+        self._out_statuses = np.empty(len(self.devices), np.int8)
+
         self.running = False
         self.thread = None
+        self.update_interval = 5.0  # период генерации в секундах
+
+        # Тренд считается рекуррентностью поворота угла: раз шаг по
+        # времени известен, sin/cos следующего тика получаются из
+        # текущих двумя векторными умножениями вместо вызова np.sin.
+        # Накопленная ошибка гасится периодической пересинхронизацией
+        dtheta = 2 * np.pi * self.update_interval / self._trend_periods
+        self._trend_cos_d = np.cos(dtheta)
+        self._trend_sin_d = np.sin(dtheta)
+        self._trend_sin = None
+        self._trend_cos = None
+        self._trend_resync_interval = 720  # тиков между пересинхронизациями
+        self._ticks_since_resync = 0
+        self._stop_event = threading.Event()
         self.anomaly_probability = 0.01  # 1% вероятность аномалии
         self.manual_anomalies = {}  # Для ручного внесения аномалий
+        self._anomaly_heap = []  # Куча (время истечения, device_id) для дешевого удаления
+
+        # Ограничение истории (хранение за последние 24 часа)
+        # 24 часа * 60 минут * 60 секунд / 5 секунд * кол-во устройств
+        self.max_history_records = int(24 * 60 * 60 / 5 * len(self.devices))
+        # Усечение выполняется лениво, раз в N тиков (~1 час при тике 5 с)
+        self.history_trim_interval = 720
+        self._ticks_since_trim = 0
+
+        # Кольцевой буфер истории в памяти: зеркалирует файл текущего
+        # дня, старые записи вытесняются на уровне C без реаллокаций
+        self._history = deque(maxlen=self.max_history_records)
+
+
+        # Двойная буферизация вывода (слоты A/B): цикл генерации
+        # собирает тик N+1 в свободном слоте, пока фоновый поток пишет
+        # слот тика N на диск — запись перекрывается с вычислениями.
+        # bytearray сохраняет выделенную емкость между тиками, так что
+        # в установившемся режиме сборка не выделяет новых объектов bytes
+        self._slot_bufs = [
+            {"current": bytearray(), "history": bytearray()},
+            {"current": bytearray(), "history": bytearray()},
+        ]
+        self._slot_free = [threading.Event(), threading.Event()]
+        for event in self._slot_free:
+            event.set()
+        self._flush_queue = queue.Queue(maxsize=2)
+        self._flush_thread = None
+        self._tick_index = 0
+
+        # Кольцевой буфер истории разделяется с потоком записи
+        # (усечение читает его целиком), поэтому доступ под замком
+        self._history_lock = threading.Lock()
+
+        # Путь к файлу истории пересчитывается только при смене суток
+        self._current_data_path = os.path.join(self.data_path, "current_data.json")
+        self._current_tmp_path = self._current_data_path + ".tmp"
+        self._history_day = None
+        self._history_path = None
     
     def ensure_data_dir(self):
         """Убедиться, что директория для данных существует"""
@@ -110,9 +278,8 @@ class SensorDataGenerator:
         Returns:
             tuple: (значение, статус)
         """
-        sensor_type = device["type"]
-        config = self.sensor_configs[sensor_type]
-        
+        config = device["_config"]
+
         # Проверка на ручные аномалии
         if device["device_id"] in self.manual_anomalies:
             anomaly = self.manual_anomalies[device["device_id"]]
@@ -128,16 +295,16 @@ class SensorDataGenerator:
         )
         
         # Случайное отклонение (Гауссово распределение)
-        random_component = random.gauss(0, config["variance"])
-        
+        random_component = self._rng.normal(0, config["variance"])
+
         # Определение финального значения
         value = config["base_value"] + trend_component + random_component
-        
+
         # Случайная аномалия
-        if random.random() < self.anomaly_probability:
+        if self._rng.random() < self.anomaly_probability:
             # Значительное отклонение от нормы
-            direction = 1 if random.random() > 0.5 else -1
-            anomaly_magnitude = (config["normal_range"][1] - config["normal_range"][0]) * random.uniform(1.2, 1.5)
+            direction = 1 if self._rng.random() > 0.5 else -1
+            anomaly_magnitude = (config["normal_range"][1] - config["normal_range"][0]) * self._rng.uniform(1.2, 1.5)
             value = value + direction * anomaly_magnitude
         
         # Определение статуса
@@ -149,6 +316,76 @@ class SensorDataGenerator:
         
         return round(value, 2), status
     
+    def generate_values_batch(self, timestamp):
+        """
+        Генерация значений всех устройств за один векторный проход.
+
+        Случайные выборки тика берутся заранее, после чего весь расчет
+        выполняет _tick_kernel над SoA-массивами с записью в
+        предвыделенные выходные массивы. Ручные аномалии накладываются
+        поверх результата по индексу устройства.
+
+        Args:
+            timestamp (float): Временная метка
+
+        Returns:
+            tuple: (массив значений, массив кодов статусов — индексов
+                    в _STATUS_LABELS)
+        """
+        n = len(self.devices)
+
+        # Тренд по рекуррентности sin(θ+dθ) = sinθ·cosdθ + cosθ·sindθ;
+        # точный np.sin вызывается только при пересинхронизации
+        if self._trend_sin is None or self._ticks_since_resync >= self._trend_resync_interval:
+            theta = 2 * np.pi * timestamp / self._trend_periods
+            self._trend_sin = np.sin(theta)
+            self._trend_cos = np.cos(theta)
+            self._ticks_since_resync = 0
+        else:
+            sin_t, cos_t = self._trend_sin, self._trend_cos
+            self._trend_sin = sin_t * self._trend_cos_d + cos_t * self._trend_sin_d
+            self._trend_cos = cos_t * self._trend_cos_d - sin_t * self._trend_sin_d
+            self._ticks_since_resync += 1
+
+        _tick_kernel(
+            self._base_values, self._variances, self._trend_amplitudes,
+            self._trend_sin,
+            self._normal_lo, self._normal_hi, self._warning_lo, self._warning_hi,
+            self._rng.standard_normal(n), self._rng.random(n),
+            self._rng.random(n), self._rng.random(n),
+            self.anomaly_probability,
+            self._out_values, self._out_statuses,
+        )
+        values = self._out_values
+        statuses = self._out_statuses
+
+        # Ручные аномалии поверх векторного расчета: истекшие снимаются
+        # один раз по куче, оставшиеся накладываются по индексу
+        self._expire_anomalies(timestamp)
+        if self.manual_anomalies:
+            for i, device in enumerate(self.devices):
+                anomaly = self.manual_anomalies.get(device["device_id"])
+                if anomaly is not None:
+                    values[i] = anomaly["value"]
+                    statuses[i] = 2
+
+        return values, statuses
+
+    def _expire_anomalies(self, now):
+        """
+        Удаление истекших ручных аномалий.
+
+        Куча упорядочена по времени истечения, поэтому за тик
+        проверяется только ее вершина — без обхода всех устройств.
+        """
+        while self._anomaly_heap and self._anomaly_heap[0][0] < now:
+            _, device_id = heapq.heappop(self._anomaly_heap)
+            anomaly = self.manual_anomalies.get(device_id)
+            # Аномалия могла быть переустановлена с новым сроком —
+            # удаляем только действительно истекшую
+            if anomaly is not None and anomaly["end_time"] < now:
+                del self.manual_anomalies[device_id]
+
     def add_manual_anomaly(self, device_id, value, duration=60):
         """
         Добавить ручную аномалию для устройства.
@@ -158,104 +395,205 @@ class SensorDataGenerator:
             value (float): Аномальное значение
             duration (int): Продолжительность аномалии в секундах
         """
+        end_time = time.time() + duration
         self.manual_anomalies[device_id] = {
             "value": value,
-            "end_time": time.time() + duration
+            "end_time": end_time
         }
+        heapq.heappush(self._anomaly_heap, (end_time, device_id))
     
+    def _render_record(self, device, value, timestamp, status):
+        """
+        Сборка готовой JSON-записи устройства в байтах.
+
+        Args:
+            device (dict): Информация об устройстве
+            value (float): Значение датчика
+            timestamp (float): Временная метка
+            status (str): Статус показания
+
+        Returns:
+            bytes: JSON-объект записи
+        """
+        tail = f'{float(value)},"timestamp":{timestamp},"status":"{status}"}}'
+        return device["_json_prefix"] + tail.encode('utf-8')
+
     def generate_data(self):
         """Генерация и сохранение данных для всех устройств"""
         while self.running:
             timestamp = time.time()
-            current_time = datetime.fromtimestamp(timestamp)
-            
-            data_batch = []
-            
-            for device in self.devices:
-                value, status = self.generate_value(device, timestamp)
-                
-                sensor_data = {
-                    "device_id": device["device_id"],
-                    "type": device["type"],
-                    "value": value,
-                    "unit": self.sensor_configs[device["type"]]["unit"],
-                    "timestamp": timestamp,
-                    "status": status
-                }
-                data_batch.append(sensor_data)
-                
-                # Сохранение в отдельный файл для каждого устройства
-                device_file_path = os.path.join(self.data_path, f"{device['device_id']}.json")
-                self.save_device_data(device_file_path, sensor_data)
-            
-            # Сохранение текущих данных всех устройств в единый файл
-            current_data_path = os.path.join(self.data_path, "current_data.json")
-            with open(current_data_path, 'w') as file:
-                json.dump(data_batch, file, indent=2)
-            
-            # Сохранение исторических данных
-            history_path = os.path.join(self.data_path, f"history_{current_time.strftime('%Y%m%d')}.json")
-            self.save_history_data(history_path, data_batch)
-            
-            # Задержка перед следующей генерацией
-            time.sleep(5)  # обновление каждые 5 секунд
+
+            # Имя файла истории меняется только в полночь — строим его
+            # заново лишь при смене локальных суток
+            day = int((timestamp - time.timezone) // 86400)
+            if day != self._history_day:
+                self._history_day = day
+                date_str = datetime.fromtimestamp(timestamp).strftime('%Y%m%d')
+                self._history_path = os.path.join(self.data_path, f"history_{date_str}.jsonl")
+                self._rebuild_history_buffer()
+
+            values, statuses = self.generate_values_batch(timestamp)
+
+            # Каждая запись собирается из готового префикса устройства и
+            # переменного хвоста — без пересборки словаря и его
+            # сериализации на каждом тике
+            record_batch = [
+                self._render_record(device, values[i], timestamp, _STATUS_LABELS[statuses[i]])
+                for i, device in enumerate(self.devices)
+            ]
+
+            # Выбор свободного слота двойной буферизации: ожидание
+            # срабатывает только если запись предыдущего использования
+            # слота еще не завершилась (диск не успевает за тиком)
+            slot = self._tick_index & 1
+            self._tick_index += 1
+            self._slot_free[slot].wait()
+            self._slot_free[slot].clear()
+            bufs = self._slot_bufs[slot]
+
+            # Текущие данные всех устройств — единый JSON-массив.
+            # Отдельные файлы на устройство не ведутся: последние
+            # показания каждого датчика и так есть в current_data.json
+            buf = bufs["current"]
+            buf.clear()
+            if self.pretty:
+                # Отладочный режим: файл пересобирается с отступами,
+                # это дороже и включается только явно
+                buf += _dumps([_loads(record) for record in record_batch], pretty=True)
+            else:
+                buf += b"["
+                for j, record in enumerate(record_batch):
+                    if j:
+                        buf += b","
+                    buf += record
+                buf += b"]"
+
+            # Порция истории: одна запись на строку (JSON-Lines)
+            buf = bufs["history"]
+            buf.clear()
+            for record in record_batch:
+                buf += record
+                buf += b"\n"
+
+            with self._history_lock:
+                self._history.extend(record_batch)
+
+            # Запись выполняет фоновый поток — цикл сразу переходит к
+            # ожиданию и вычислениям следующего тика
+            self._flush_queue.put((slot, self._history_path))
+
+            # Ожидание до дедлайна следующего тика: период не «плывет»
+            # из-за длительности записи, а stop() прерывает ожидание сразу
+            sleep_for = self.update_interval - (time.time() - timestamp)
+            if sleep_for > 0:
+                self._stop_event.wait(sleep_for)
     
-    def save_device_data(self, file_path, data):
+    def _flush_loop(self):
         """
-        Сохранение последних данных устройства.
-        
-        Args:
-            file_path (str): Путь к файлу устройства
-            data (dict): Данные датчика
+        Фоновая запись подготовленных буферов на диск.
+
+        Блокирующие вызовы записи отпускают GIL, поэтому пока здесь
+        пишется слот тика N, цикл генерации считает значения тика N+1.
+        current_data.json публикуется атомарно: готовый буфер пишется во
+        временный файл и подменяет основной через os.replace, так что
+        читатели никогда не видят полузаписанного состояния. Порция
+        истории дописывается в конец файла — работа за тик
+        пропорциональна размеру порции, а не всей истории. Усечение до
+        последних 24 часов выполняется лениво, раз в
+        history_trim_interval тиков.
         """
-        with open(file_path, 'w') as file:
-            json.dump(data, file, indent=2)
-    
-    def save_history_data(self, file_path, data_batch):
+        while True:
+            task = self._flush_queue.get()
+            if task is None:
+                break
+            slot, history_path = task
+            bufs = self._slot_bufs[slot]
+            try:
+                fd = os.open(
+                    self._current_tmp_path,
+                    os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644
+                )
+                try:
+                    os.write(fd, bufs["current"])
+                finally:
+                    os.close(fd)
+                os.replace(self._current_tmp_path, self._current_data_path)
+
+                with open(history_path, 'ab') as file:
+                    file.write(bufs["history"])
+
+                self._ticks_since_trim += 1
+                if self._ticks_since_trim >= self.history_trim_interval:
+                    self._ticks_since_trim = 0
+                    self.trim_history_file(history_path)
+            finally:
+                # Слот снова доступен циклу генерации
+                self._slot_free[slot].set()
+
+    def trim_history_file(self, file_path):
         """
-        Добавление данных в исторический файл.
-        
+        Усечение файла истории до последних max_history_records записей.
+
+        Записи берутся из кольцевого буфера в памяти, поэтому файл не
+        нужно читать и разбирать заново; укороченная история пишется во
+        временный файл и атомарно подменяет исходный через os.replace.
+
         Args:
             file_path (str): Путь к файлу истории
-            data_batch (list): Список данных со всех устройств
         """
-        history_data = []
-        
-        # Если файл существует, загружаем его содержимое
-        if os.path.exists(file_path):
-            with open(file_path, 'r') as file:
-                try:
-                    history_data = json.load(file)
-                except json.JSONDecodeError:
-                    history_data = []
-        
-        # Добавляем новые данные
-        history_data.extend(data_batch)
-        
-        # Ограничиваем размер файла (хранение за последние 24 часа)
-        # 24 часа * 60 минут * 60 секунд / 5 секунд * кол-во устройств
-        max_records = int(24 * 60 * 60 / 5 * len(self.devices))
-        if len(history_data) > max_records:
-            history_data = history_data[-max_records:]
-        
-        # Сохраняем обновленную историю
-        with open(file_path, 'w') as file:
-            json.dump(history_data, file, indent=2)
+        # Пока буфер не заполнен, файл не превышает лимита; снимок под
+        # замком — цикл генерации параллельно дописывает новые записи
+        with self._history_lock:
+            if len(self._history) < self.max_history_records:
+                return
+            snapshot = list(self._history)
+
+        tmp_path = file_path + ".tmp"
+        with open(tmp_path, 'wb') as file:
+            file.write(b"\n".join(snapshot) + b"\n")
+        os.replace(tmp_path, file_path)
+
+    def _rebuild_history_buffer(self):
+        """
+        Восстановление кольцевого буфера из файла истории текущего дня.
+
+        Вызывается при запуске и при смене суток: существующий файл
+        читается построчно прямо в deque (лишние старые строки вытесняются
+        по мере чтения), нового файла еще нет — буфер просто очищается.
+        """
+        with self._history_lock:
+            self._history.clear()
+            try:
+                with open(self._history_path, 'rb') as file:
+                    for line in file:
+                        stripped = line.rstrip(b"\n")
+                        if stripped:
+                            self._history.append(stripped)
+            except OSError:
+                pass
     
     def start(self):
         """Запуск генератора данных в отдельном потоке"""
         if not self.running:
             self.running = True
+            self._stop_event.clear()
+            self._flush_thread = threading.Thread(target=self._flush_loop)
+            self._flush_thread.daemon = True
+            self._flush_thread.start()
             self.thread = threading.Thread(target=self.generate_data)
             self.thread.daemon = True
             self.thread.start()
             print("Генератор данных запущен")
-    
+
     def stop(self):
         """Остановка генератора данных"""
         if self.running:
             self.running = False
+            self._stop_event.set()
             self.thread.join()
+            # Дать потоку записи дописать поставленные в очередь буферы
+            self._flush_queue.put(None)
+            self._flush_thread.join()
             print("Генератор данных остановлен")
 
 